@@ -8,6 +8,8 @@ from .typing import AsyncFn
 
 
 class TaskAPI(Hashable):
+    __slots__ = ()
+
     name: str
     daemon: bool
     parent: Optional["TaskWithChildrenAPI"]
@@ -31,6 +33,8 @@ class TaskAPI(Hashable):
 
 
 class TaskWithChildrenAPI(TaskAPI):
+    __slots__ = ()
+
     children: Set[TaskAPI]
 
     @abstractmethod
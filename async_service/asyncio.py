@@ -1,5 +1,7 @@
 import asyncio
+from contextlib import asynccontextmanager
 import functools
+import logging
 import sys
 from typing import (
     Any,
@@ -7,25 +9,40 @@ from typing import (
     Awaitable,
     Callable,
     Coroutine,
+    Dict,
     Optional,
+    Sequence,
     Set,
     TypeVar,
     cast,
 )
 
-from async_generator import asynccontextmanager
 from trio import MultiError
 
 from ._utils import get_task_name
 from .abc import ManagerAPI, ServiceAPI, TaskAPI, TaskWithChildrenAPI
-from .asyncio_compat import get_current_task
 from .base import BaseChildServiceTask, BaseFunctionTask, BaseManager
 from .exceptions import DaemonTaskExit, LifecycleError
-from .typing import EXC_INFO
+from .typing import AsyncFn
 
 
 class FunctionTask(BaseFunctionTask):
+    __slots__ = ("asyncio_task", "_wait_done_event")
+
     asyncio_task: "asyncio.Future[Any]"
+    _wait_done_event: Optional[asyncio.Event]
+
+    def __init__(
+        self,
+        name: str,
+        daemon: bool,
+        parent: Optional[TaskWithChildrenAPI],
+        async_fn: AsyncFn,
+        async_fn_args: Sequence[Any],
+    ) -> None:
+        super().__init__(name, daemon, parent, async_fn, async_fn_args)
+
+        self._wait_done_event = None
 
     #
     # Core Task API
@@ -37,15 +54,14 @@ class FunctionTask(BaseFunctionTask):
                 raise DaemonTaskExit(f"Daemon task {self} exited")
 
             while self.children:
-                # copy, because children can change size
-                active_children = tuple(self.children)
-                # Children will be removed from the list as they exit. Here,
-                #   we just want to check if the list is empty, but to wait until
+                # Children will be removed from the set as they exit. Here,
+                #   we just want to check if the set is empty, but to wait until
                 #   at least one child has finished.
                 # There is some intuition that gather()-ing all the children
                 #   adds more overhead than the following approach of just waiting
-                #   for a single random-ish child to exit.
-                await active_children[0].wait_done()
+                #   for a single random-ish child to exit.  We also avoid
+                #   copying the whole set just to pick one child out of it.
+                await next(iter(self.children)).wait_done()
         finally:
             if self.parent is not None:
                 self.parent.discard_child(self)
@@ -59,8 +75,6 @@ class FunctionTask(BaseFunctionTask):
     def is_done(self) -> bool:
         return self.asyncio_task.done()
 
-    _wait_done_event: Optional[asyncio.Event] = None
-
     async def wait_done(self) -> None:
         if self.asyncio_task.done():
             return
@@ -76,6 +90,8 @@ class FunctionTask(BaseFunctionTask):
 
 
 class ChildServiceTask(BaseChildServiceTask):
+    __slots__ = ("asyncio_task",)
+
     asyncio_task: "asyncio.Future[Any]"
 
     def __init__(
@@ -117,6 +133,7 @@ class AsyncioManager(BaseManager):
 
         # task tracking
         self._asyncio_tasks = set()
+        self._tasks_by_asyncio_task: Dict["asyncio.Future[Any]", FunctionTask] = {}
 
     #
     # System Tasks
@@ -151,13 +168,15 @@ class AsyncioManager(BaseManager):
         # task will end up being cancelled as part of it's parent task's cancel
         # scope, **or** if it was scheduled by an external API call it will be
         # cancelled as part of the global task nursery's cancellation.
+        is_debug = self.logger.isEnabledFor(logging.DEBUG)
         for task in tuple(self._root_tasks):
-            msg = "%s: triggering cancellation of root task %s" % (self, task.name)
-            if isinstance(task, TaskWithChildrenAPI):
-                msg += " and all its children (%s)" % (
-                    [child.name for child in task.children]
-                )
-            self.logger.debug(msg)
+            if is_debug:
+                msg = "%s: triggering cancellation of root task %s" % (self, task.name)
+                if isinstance(task, TaskWithChildrenAPI):
+                    msg += " and all its children (%s)" % (
+                        [child.name for child in task.children]
+                    )
+                self.logger.debug(msg)
             try:
                 await task.cancel()
             except Exception as e:
@@ -169,7 +188,7 @@ class AsyncioManager(BaseManager):
                     e,
                     self,
                 )
-                self._errors.append(cast(EXC_INFO, sys.exc_info()))
+                self._errors.append(e)
             else:
                 self.logger.debug("%s: cancelled %s", self, task.name)
 
@@ -235,13 +254,15 @@ class AsyncioManager(BaseManager):
                 async with cleanup_tasks(handle_cancelled_task):
                     self._started.set()
 
-                    self.run_task(self._service.run)
-
-                    # This is hack to get the task stats correct.  We don't want to
-                    # count the `Service.run` method as a task.  This is still
-                    # imperfect as it will still count as a completed task when it
-                    # finishes.
-                    self._total_task_count = 0
+                    self._run_service_task(
+                        FunctionTask(
+                            name="run",
+                            daemon=False,
+                            parent=None,
+                            async_fn=self._service.run,
+                            async_fn_args=(),
+                        )
+                    )
 
                     await self._wait_all_tasks_done()
         finally:
@@ -252,12 +273,7 @@ class AsyncioManager(BaseManager):
         # service/tasks and swallow/collect exceptions so that they can be
         # reported all together here.
         if self.did_error:
-            raise MultiError(
-                tuple(
-                    exc_value.with_traceback(exc_tb)
-                    for _, exc_value, exc_tb in self._errors
-                )
-            )
+            raise MultiError(tuple(self._errors))
 
     #
     # Event API mirror
@@ -297,15 +313,24 @@ class AsyncioManager(BaseManager):
         """
         Find the :class:`async_service.asyncio.FunctionTask` instance that corresponds to
         the given :class:`asyncio.Task` instance.
+
+        In the case that no tasks match we assume this is a new `root` task and
+        return `None` as the parent.
         """
-        for task in FunctionTask.iterate_tasks(*self._root_tasks):
-            if asyncio_task is task.asyncio_task:
-                return task
+        return self._tasks_by_asyncio_task.get(asyncio_task)
 
-        else:
-            # In the case that no tasks match we assume this is a new `root`
-            # task and return `None` as the parent.
-            return None
+    async def _run_and_manage_task(self, task: TaskAPI) -> None:
+        # Index function tasks by the asyncio task they run in so that looking
+        # up the parent of a newly scheduled task doesn't require walking the
+        # whole task tree.
+        asyncio_task = self._get_current_task()
+        if isinstance(task, FunctionTask):
+            self._tasks_by_asyncio_task[asyncio_task] = task
+
+        try:
+            await super()._run_and_manage_task(task)
+        finally:
+            self._tasks_by_asyncio_task.pop(asyncio_task, None)
 
     def _schedule_task(self, task: TaskAPI) -> None:
         # No clean way to inform `mypy` without a `cast` that
@@ -321,7 +346,7 @@ class AsyncioManager(BaseManager):
         task.asyncio_task = asyncio_task  # type: ignore
 
     def _get_current_task(self) -> "asyncio.Future[Any]":
-        current_asyncio_task = get_current_task()
+        current_asyncio_task = asyncio.current_task()
         if current_asyncio_task is None:
             raise LifecycleError("Invariant: current asyncio task is None")
         return current_asyncio_task
@@ -455,9 +480,4 @@ async def background_asyncio_service(
     finally:
         if manager.did_error:
             # TODO: better place for this.
-            raise MultiError(
-                tuple(
-                    exc_value.with_traceback(exc_tb)
-                    for _, exc_value, exc_tb in manager._errors
-                )
-            )
+            raise MultiError(tuple(manager._errors))
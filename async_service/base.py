@@ -2,7 +2,6 @@ from abc import abstractmethod
 import asyncio
 from collections import Counter
 import logging
-import sys
 from typing import (
     Any,
     Awaitable,
@@ -14,9 +13,7 @@ from typing import (
     Set,
     Type,
     TypeVar,
-    cast,
 )
-import uuid
 
 from ._utils import is_verbose_logging_enabled
 from .abc import (
@@ -28,7 +25,7 @@ from .abc import (
 )
 from .exceptions import DaemonTaskExit, LifecycleError, TooManyChildrenException
 from .stats import Stats, TaskStats
-from .typing import EXC_INFO, AsyncFn
+from .typing import AsyncFn
 
 MAX_CHILDREN_TASKS = 1000
 
@@ -80,6 +77,10 @@ def as_service(service_fn: LogicFnType) -> Type[ServiceAPI]:
 
 
 class BaseTask(TaskAPI):
+    # Tasks are allocated for every scheduled function or child service so
+    # they use `__slots__` to keep them small and cheap to access.
+    __slots__ = ("name", "daemon", "parent")
+
     def __init__(
         self, name: str, daemon: bool, parent: Optional[TaskWithChildrenAPI]
     ) -> None:
@@ -90,23 +91,16 @@ class BaseTask(TaskAPI):
         # parent task
         self.parent = parent
 
-        # For hashable interface.
-        self._id = uuid.uuid4()
-
-    def __hash__(self) -> int:
-        return hash(self._id)
-
-    def __eq__(self, other: Any) -> bool:
-        if isinstance(other, TaskAPI):
-            return hash(self) == hash(other)
-        else:
-            return False
+    # For hashable interface.  Tasks are only ever compared by identity.
+    __hash__ = object.__hash__
 
     def __str__(self) -> str:
         return f"{self.name}[daemon={self.daemon}]"
 
 
 class BaseTaskWithChildren(BaseTask, TaskWithChildrenAPI):
+    __slots__ = ("children",)
+
     def __init__(
         self, name: str, daemon: bool, parent: Optional[TaskWithChildrenAPI]
     ) -> None:
@@ -124,6 +118,8 @@ T = TypeVar("T", bound="BaseFunctionTask")
 
 
 class BaseFunctionTask(BaseTaskWithChildren):
+    __slots__ = ("_async_fn", "_async_fn_args")
+
     @classmethod
     def iterate_tasks(cls: Type[T], *tasks: TaskAPI) -> Iterable[T]:
         for task in tasks:
@@ -156,6 +152,8 @@ class BaseFunctionTask(BaseTaskWithChildren):
 
 
 class BaseChildServiceTask(BaseTask):
+    __slots__ = ("_child_service", "child_manager")
+
     _child_service: ServiceAPI
     child_manager: ManagerAPI
 
@@ -189,7 +187,7 @@ class BaseManager(InternalManagerAPI):
 
     _service: ServiceAPI
 
-    _errors: List[EXC_INFO]
+    _errors: List[BaseException]
 
     def __init__(self, service: ServiceAPI) -> None:
         if hasattr(service, "_manager"):
@@ -205,6 +203,10 @@ class BaseManager(InternalManagerAPI):
         # tasks
         self._root_tasks: Set[TaskAPI] = set()
 
+        # The task running the `Service.run` method.  It is managed like any
+        # other root task but isn't counted in the task stats.
+        self._service_task: Optional[TaskAPI] = None
+
         # stats
         self._total_task_count = 0
         self._done_task_count = 0
@@ -255,16 +257,11 @@ class BaseManager(InternalManagerAPI):
 
     @property
     def stats(self) -> Stats:
-        # The `max` call here ensures that if this is called prior to the
-        # `Service.run` method starting we don't return `-1`
-        total_count = max(0, self._total_task_count)
-
-        # Since we track `Service.run` as a task, the `min` call here ensures
-        # that when the service is fully done that we don't represent the
-        # `Service.run` method in this count.
-        finished_count = min(total_count, self._done_task_count)
         return Stats(
-            tasks=TaskStats(total_count=total_count, finished_count=finished_count)
+            tasks=TaskStats(
+                total_count=self._total_task_count,
+                finished_count=self._done_task_count,
+            )
         )
 
     #
@@ -280,16 +277,27 @@ class BaseManager(InternalManagerAPI):
                 "Tasks may not be scheduled if the service is not running"
             )
 
-        if self.is_running and self.is_cancelled:
+        if self.is_cancelled:
             self.logger.debug(
                 "%s: service is being cancelled. Not running task %s", self, task
             )
             return
 
         self._add_child_task(task.parent, task)
-        self._total_task_count += 1
+        try:
+            self._schedule_task(task)
+        except BaseException:
+            # A task that failed to be scheduled will never run, so it must not
+            # be left behind in the task tree for cancellation to wait on.
+            self._discard_child_task(task.parent, task)
+            raise
 
-        self._schedule_task(task)
+        if task is not self._service_task:
+            self._total_task_count += 1
+
+    def _run_service_task(self, task: TaskAPI) -> None:
+        self._service_task = task
+        self._common_run_task(task)
 
     def _add_child_task(
         self, parent: Optional[TaskWithChildrenAPI], task: TaskAPI
@@ -315,6 +323,14 @@ class BaseManager(InternalManagerAPI):
                 self.logger.debug("%s: %s running child task %s", self, parent, task)
             parent.add_child(task)
 
+    def _discard_child_task(
+        self, parent: Optional[TaskWithChildrenAPI], task: TaskAPI
+    ) -> None:
+        if parent is None:
+            self._root_tasks.discard(task)
+        else:
+            parent.discard_child(task)
+
     async def _run_and_manage_task(self, task: TaskAPI) -> None:
         if self._verbose:
             self.logger.debug("%s: task %s running", self, task)
@@ -351,7 +367,7 @@ class BaseManager(InternalManagerAPI):
                 # Only show stacktrace if this is **not** a DaemonTaskExit error
                 exc_info=not isinstance(err, DaemonTaskExit),
             )
-            self._errors.append(cast(EXC_INFO, sys.exc_info()))
+            self._errors.append(err)
             self.cancel()
         else:
             if task.parent is None:
@@ -359,4 +375,5 @@ class BaseManager(InternalManagerAPI):
             if self._verbose:
                 self.logger.debug("%s: task %s exited cleanly.", self, task)
         finally:
-            self._done_task_count += 1
+            if task is not self._service_task:
+                self._done_task_count += 1
@@ -1,5 +1,6 @@
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
 import functools
-import sys
 from typing import (
     Any,
     AsyncIterator,
@@ -7,14 +8,14 @@ from typing import (
     Callable,
     Coroutine,
     Dict,
+    Iterator,
     Optional,
     Sequence,
-    Tuple,
+    Set,
     TypeVar,
     cast,
 )
 
-from async_generator import asynccontextmanager
 import trio
 import trio_typing
 
@@ -22,11 +23,20 @@ from ._utils import get_task_name
 from .abc import ManagerAPI, ServiceAPI, TaskAPI, TaskWithChildrenAPI
 from .base import BaseChildServiceTask, BaseFunctionTask, BaseManager
 from .exceptions import DaemonTaskExit, LifecycleError
-from .typing import EXC_INFO, AsyncFn
+from .typing import AsyncFn
+
+# The trio task which is currently running an `external_api` call.  External
+# API calls run in the caller's task, but anything they schedule must still
+# become a root task rather than a child of the caller.
+_external_api_trio_task: ContextVar[Optional[trio.lowlevel.Task]] = ContextVar(
+    "_external_api_trio_task", default=None
+)
 
 
 class FunctionTask(BaseFunctionTask):
-    _trio_task: Optional[trio.lowlevel.Task] = None
+    __slots__ = ("_trio_task", "_done", "_cancel_scope")
+
+    _trio_task: Optional[trio.lowlevel.Task]
 
     def __init__(
         self,
@@ -38,6 +48,8 @@ class FunctionTask(BaseFunctionTask):
     ) -> None:
         super().__init__(name, daemon, parent, async_fn, async_fn_args)
 
+        self._trio_task = None
+
         # We use an event to manually track when the child task is "done".
         # This is because trio has no API for awaiting completion of a task.
         self._done = trio.Event()
@@ -78,15 +90,20 @@ class FunctionTask(BaseFunctionTask):
                     raise DaemonTaskExit(f"Daemon task {self} exited")
 
                 while self.children:
-                    await tuple(self.children)[0].wait_done()
+                    await next(iter(self.children)).wait_done()
         finally:
             self._done.set()
             if self.parent is not None:
                 self.parent.discard_child(self)
 
     async def cancel(self) -> None:
-        for task in tuple(self.children):
-            await task.cancel()
+        # Sibling tasks are cancelled concurrently, but all of them have to be
+        # done before our own cancel scope is triggered.  Leaf tasks skip the
+        # nursery entirely.
+        if self.children:
+            async with trio.open_nursery() as nursery:
+                for task in tuple(self.children):
+                    nursery.start_soon(task.cancel)
         self._cancel_scope.cancel()
         await self.wait_done()
 
@@ -99,6 +116,8 @@ class FunctionTask(BaseFunctionTask):
 
 
 class ChildServiceTask(BaseChildServiceTask):
+    __slots__ = ()
+
     def __init__(
         self,
         name: str,
@@ -116,6 +135,13 @@ class ChildServiceTask(BaseChildServiceTask):
             await self.child_manager.stop()
 
 
+# Lifecycle state flags for `TrioManager`.  Each flag is only ever set once
+# which makes the state transitions monotone.
+_STARTED = 1
+_CANCELLED = 2
+_FINISHED = 4
+
+
 class TrioManager(BaseManager):
     # A nursery for sub tasks and services.  This nursery is cancelled if the
     # service is cancelled but allowed to exit normally if the service exits.
@@ -124,27 +150,57 @@ class TrioManager(BaseManager):
     def __init__(self, service: ServiceAPI) -> None:
         super().__init__(service)
 
-        # events
-        self._started = trio.Event()
-        self._cancelled = trio.Event()
-        self._finished = trio.Event()
+        # lifecycle state: a bitmask of the `_STARTED`, `_CANCELLED` and
+        # `_FINISHED` flags along with a single event which is replaced on
+        # every state transition.
+        self._state = 0
+        self._state_changed = trio.Event()
 
         # locks
         self._run_lock = trio.Lock()
 
+        # task tracking
+        self._tasks_by_trio_task: Dict[trio.lowlevel.Task, FunctionTask] = {}
+
+        # cancel scopes of in-flight external API calls
+        self._external_api_scopes: Set[trio.CancelScope] = set()
+
+    #
+    # Lifecycle State
+    #
+    def _set_state(self, flag: int) -> None:
+        if self._state & flag:
+            return
+        self._state |= flag
+
+        # Wake up everything waiting on the previous state and start tracking
+        # the next transition with a fresh event.
+        state_changed, self._state_changed = self._state_changed, trio.Event()
+        state_changed.set()
+
+    async def _wait_state(self, flag: int) -> None:
+        if self._state & flag:
+            # Waiting should always be a checkpoint, even if there is nothing to
+            # wait for.
+            await trio.lowlevel.checkpoint()
+        while not self._state & flag:
+            await self._state_changed.wait()
+
     #
     # System Tasks
     #
     async def _handle_cancelled(self) -> None:
         self.logger.debug("%s: _handle_cancelled waiting for cancellation", self)
-        await self._cancelled.wait()
+        await self._wait_state(_CANCELLED)
         self.logger.debug("%s: _handle_cancelled triggering task cancellation", self)
 
         # The `_root_tasks` changes size as each task completes itself
         # and removes itself from the set.  For this reason we iterate over a
-        # copy of the set.
-        for task in tuple(self._root_tasks):
-            await task.cancel()
+        # copy of the set.  The root tasks are independent of each other so
+        # they are all cancelled concurrently.
+        async with trio.open_nursery() as nursery:
+            for task in tuple(self._root_tasks):
+                nursery.start_soon(task.cancel)
 
         # This finaly cancellation of the task nursery's cancel scope ensures
         # that nothing is left behind and that the service will reliably exit.
@@ -172,57 +228,60 @@ class TrioManager(BaseManager):
                         async with trio.open_nursery() as task_nursery:
                             self._task_nursery = task_nursery
 
-                            self._started.set()
-
-                            self.run_task(self._service.run, name="run")
+                            self._set_state(_STARTED)
 
-                            # This is hack to get the task stats correct.  We don't want to
-                            # count the `Service.run` method as a task.  This is still
-                            # imperfect as it will still count as a completed task when it
-                            # finishes.
-                            self._total_task_count = 0
+                            self._run_service_task(
+                                FunctionTask(
+                                    name="run",
+                                    daemon=False,
+                                    parent=None,
+                                    async_fn=self._service.run,
+                                    async_fn_args=(),
+                                )
+                            )
 
                             # ***BLOCKING HERE***
                             # The code flow will block here until the background tasks have
                             # completed or cancellation occurs.
-                    except Exception:
+                    except Exception as err:
                         # Exceptions from any tasks spawned by our service will be caught by trio
                         # and raised here, so we store them to report together with any others we
                         # have already captured.
-                        self._errors.append(cast(EXC_INFO, sys.exc_info()))
+                        self._errors.append(err)
                     finally:
                         system_nursery.cancel_scope.cancel()
 
         finally:
             # We need this inside a finally because a trio.Cancelled exception may be raised
             # here and it wouldn't be swalled by the 'except Exception' above.
-            self._finished.set()
+            for cancel_scope in self._external_api_scopes:
+                cancel_scope.cancel()
+            self._set_state(_FINISHED)
             self.logger.debug("%s: finished", self)
 
         # This is outside of the finally block above because we don't want to suppress
         # trio.Cancelled or trio.MultiError exceptions coming directly from trio.
         if self.did_error:
-            raise trio.MultiError(
-                tuple(
-                    exc_value.with_traceback(exc_tb)
-                    for _, exc_value, exc_tb in self._errors
-                )
-            )
+            raise trio.MultiError(tuple(self._errors))
 
     #
     # Event API mirror
     #
     @property
     def is_started(self) -> bool:
-        return self._started.is_set()
+        return bool(self._state & _STARTED)
+
+    @property
+    def is_running(self) -> bool:
+        return self._state & (_STARTED | _FINISHED) == _STARTED
 
     @property
     def is_cancelled(self) -> bool:
-        return self._cancelled.is_set()
+        return bool(self._state & _CANCELLED)
 
     @property
     def is_finished(self) -> bool:
-        return self._finished.is_set()
+        return bool(self._state & _FINISHED)
 
     #
     # Control API
@@ -233,16 +292,28 @@ class TrioManager(BaseManager):
         elif not self.is_running:
             return
         else:
-            self._cancelled.set()
+            self._set_state(_CANCELLED)
 
     #
     # Wait API
     #
     async def wait_started(self) -> None:
-        await self._started.wait()
+        await self._wait_state(_STARTED)
 
     async def wait_finished(self) -> None:
-        await self._finished.wait()
+        await self._wait_state(_FINISHED)
+
+    @contextmanager
+    def _cancel_when_finished(self) -> Iterator[trio.CancelScope]:
+        """
+        Open a cancel scope which will be cancelled when the service finishes.
+        """
+        with trio.CancelScope() as cancel_scope:
+            self._external_api_scopes.add(cancel_scope)
+            try:
+                yield cancel_scope
+            finally:
+                self._external_api_scopes.discard(cancel_scope)
 
     def _find_parent_task(
         self, trio_task: trio.lowlevel.Task
@@ -250,22 +321,27 @@ class TrioManager(BaseManager):
         """
         Find the :class:`async_service.trio.FunctionTask` instance that corresponds to
         the given :class:`trio.lowlevel.Task` instance.
+
+        In the case that no tasks match we assume this is a new `root` task and
+        return `None` as the parent.  The same goes for tasks scheduled from
+        within an external API call.
         """
-        for task in FunctionTask.iterate_tasks(*self._root_tasks):
-            # Any task that has not had its `trio_task` set can be safely
-            # skipped as those are still in the process of starting up which
-            # means that they cannot be the parent task since they will not
-            # have had a chance to schedule child tasks.
-            if not task.has_trio_task:
-                continue
+        if _external_api_trio_task.get() is trio_task:
+            return None
+        return self._tasks_by_trio_task.get(trio_task)
 
-            if trio_task is task.trio_task:
-                return task
+    async def _run_and_manage_task(self, task: TaskAPI) -> None:
+        # Index function tasks by the trio task they run in so that looking up
+        # the parent of a newly scheduled task doesn't require walking the
+        # whole task tree.
+        trio_task = trio.lowlevel.current_task()
+        if isinstance(task, FunctionTask):
+            self._tasks_by_trio_task[trio_task] = task
 
-        else:
-            # In the case that no tasks match we assume this is a new `root`
-            # task and return `None` as the parent.
-            return None
+        try:
+            await super()._run_and_manage_task(task)
+        finally:
+            self._tasks_by_trio_task.pop(trio_task, None)
 
     def _schedule_task(self, task: TaskAPI) -> None:
         self._task_nursery.start_soon(self._run_and_manage_task, task, name=str(task))
@@ -304,56 +380,17 @@ class TrioManager(BaseManager):
 TFunc = TypeVar("TFunc", bound=Callable[..., Coroutine[Any, Any, Any]])
 
 
-_ChannelPayload = Tuple[Optional[Any], Optional[BaseException]]
-
-
-async def _wait_finished(
-    service: ServiceAPI,
-    api_func: Callable[..., Any],
-    channel: trio.abc.SendChannel[_ChannelPayload],
-) -> None:
-    manager = service.get_manager()
-
-    if manager.is_finished:
-        await channel.send(
-            (
-                None,
-                LifecycleError(
-                    f"Cannot access external API {api_func}.  Service {service} is not running: "
-                ),
-            )
-        )
-        return
-
-    await manager.wait_finished()
-    await channel.send(
-        (
-            None,
-            LifecycleError(
-                f"Cannot access external API {api_func}.  Service {service} is not running: "
-            ),
-        )
+def _not_running_error(func: Callable[..., Any], service: ServiceAPI) -> LifecycleError:
+    return LifecycleError(
+        f"Cannot access external API {func}.  Service {service} is not running: "
     )
 
 
-async def _wait_api_fn(
-    self: ServiceAPI,
-    api_fn: Callable[..., Any],
-    args: Tuple[Any, ...],
-    kwargs: Dict[str, Any],
-    channel: trio.abc.SendChannel[_ChannelPayload],
-) -> None:
-    try:
-        result = await api_fn(self, *args, **kwargs)
-    except Exception:
-        _, exc_value, exc_tb = sys.exc_info()
-        if exc_value is None or exc_tb is None:
-            raise Exception(
-                "This should be unreachable but acts as a type guard for mypy"
-            )
-        await channel.send((None, exc_value.with_traceback(exc_tb)))
-    else:
-        await channel.send((result, None))
+async def _wait_finished(manager: ManagerAPI, cancel_scope: trio.CancelScope) -> None:
+    if not manager.is_finished:
+        await manager.wait_finished()
+
+    cancel_scope.cancel()
 
 
 def external_api(func: TFunc) -> TFunc:
@@ -367,28 +404,27 @@ def external_api(func: TFunc) -> TFunc:
         manager = self.get_manager()
 
         if not manager.is_running:
-            raise LifecycleError(
-                f"Cannot access external API {func}.  Service {self} is not running: "
-            )
+            raise _not_running_error(func, self)
 
-        channels: Tuple[
-            trio.abc.SendChannel[_ChannelPayload],
-            trio.abc.ReceiveChannel[_ChannelPayload],
-        ] = trio.open_memory_channel(0)
-        send_channel, receive_channel = channels
+        # The API call runs directly in the calling task.  A `TrioManager`
+        # cancels the call's scope itself when it finishes.  Any other manager
+        # only exposes the public API so we spawn a task that watches for the
+        # service finishing instead.
+        token = _external_api_trio_task.set(trio.lowlevel.current_task())
+        try:
+            if isinstance(manager, TrioManager):
+                with manager._cancel_when_finished():
+                    return await func(self, *args, **kwargs)
+            else:
+                async with trio.open_nursery() as nursery:
+                    nursery.start_soon(_wait_finished, manager, nursery.cancel_scope)
+                    result = await func(self, *args, **kwargs)
+                    nursery.cancel_scope.cancel()
+                    return result
+        finally:
+            _external_api_trio_task.reset(token)
 
-        async with trio.open_nursery() as nursery:
-            # mypy's type hints for start_soon break with this invocation.
-            nursery.start_soon(
-                _wait_api_fn, self, func, args, kwargs, send_channel  # type: ignore
-            )
-            nursery.start_soon(_wait_finished, self, func, send_channel)
-            result, err = await receive_channel.receive()
-            nursery.cancel_scope.cancel()
-        if err is None:
-            return result
-        else:
-            raise err
+        raise _not_running_error(func, self)
 
     return cast(TFunc, inner)
 
@@ -634,3 +634,44 @@ async def test_asyncio_service_with_too_many_children():
 
         with pytest.raises(TooManyChildrenException):
             await service.add_child()
+
+
+@pytest.mark.asyncio
+async def test_asyncio_manager_run_task_rolls_back_when_scheduling_fails(monkeypatch):
+    ready = asyncio.Event()
+    child_failed = asyncio.Event()
+
+    def fail_to_schedule(task):
+        raise RuntimeError("cannot schedule")
+
+    class ServiceTest(Service):
+        async def run(self):
+            await ready.wait()
+            # A task scheduled from within `run` is a child of the `run` task.
+            with pytest.raises(RuntimeError):
+                self.manager.run_task(asyncio.sleep, 100)
+            child_failed.set()
+            await self.manager.wait_finished()
+
+    service = ServiceTest()
+
+    # A task left behind in the task tree is never scheduled, so cancelling
+    # the service would wait on it forever.
+    async def run_and_cancel():
+        async with background_asyncio_service(service) as manager:
+            monkeypatch.setattr(manager, "_schedule_task", fail_to_schedule)
+
+            # A task scheduled from outside the service is a root task.
+            with pytest.raises(RuntimeError):
+                manager.run_task(asyncio.sleep, 100)
+
+            ready.set()
+            await child_failed.wait()
+
+            assert manager.stats.tasks.total_count == 0
+            manager.cancel()
+
+    await asyncio.wait_for(run_and_cancel(), timeout=1)
+
+    assert service.manager.is_finished
+    assert not service.manager.did_error
@@ -55,8 +55,6 @@ async def test_asyncio_manager_stats():
     assert manager.stats.tasks.pending_count == 0
 
 
-# This test accounts for a current deficiency in the stats tracking that will
-# count the `Service.run` method in the statistics.
 @pytest.mark.asyncio
 async def test_asyncio_manager_stats_does_not_count_main_run_method():
     ready = asyncio.Event()
@@ -82,3 +80,37 @@ async def test_asyncio_manager_stats_does_not_count_main_run_method():
     assert manager.stats.tasks.total_count == 1
     assert manager.stats.tasks.finished_count == 1
     assert manager.stats.tasks.pending_count == 0
+
+
+@pytest.mark.asyncio
+async def test_asyncio_manager_stats_external_root_task_after_run_returns():
+    release_run = asyncio.Event()
+
+    class StatsTest(Service):
+        async def run(self):
+            await release_run.wait()
+
+        def run_external_root(self):
+            self.manager.run_task(asyncio.sleep, 100)
+
+    service = StatsTest()
+    async with background_asyncio_service(service) as manager:
+        # The external root task keeps the service running once `Service.run`
+        # has returned.
+        service.run_external_root()
+        release_run.set()
+
+        # we need to yield to the event loop a few times to allow the various
+        # tasks to schedule themselves and get running.
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        assert manager.is_running
+        assert manager.stats.tasks.total_count == 1
+        assert manager.stats.tasks.finished_count == 0
+        assert manager.stats.tasks.pending_count == 1
+
+    # now check after exiting
+    assert manager.stats.tasks.total_count == 1
+    assert manager.stats.tasks.finished_count == 1
+    assert manager.stats.tasks.pending_count == 0
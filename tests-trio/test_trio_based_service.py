@@ -642,3 +642,67 @@ async def test_daemon_task_finishes_leaving_children():
 
     with pytest.raises(DaemonTaskExit):
         await TrioManager.run_service(ServiceTest())
+
+
+@pytest.mark.trio
+async def test_trio_service_cancels_sibling_tasks_concurrently(autojump_clock):
+    ready = trio.Event()
+
+    async def slow_cleanup():
+        try:
+            await trio.sleep_forever()
+        finally:
+            with trio.CancelScope(shield=True):
+                await trio.sleep(1)
+
+    class ServiceTest(Service):
+        async def run(self):
+            for _ in range(5):
+                self.manager.run_task(slow_cleanup)
+            ready.set()
+
+    async with background_trio_service(ServiceTest()) as manager:
+        await ready.wait()
+        start_at = trio.current_time()
+
+    # Each of the sibling tasks takes a second to clean up.  If they were
+    # cancelled one after the other this would take at least five seconds.
+    assert manager.is_finished
+    assert trio.current_time() - start_at < 2
+
+
+@pytest.mark.trio
+async def test_trio_manager_run_task_rolls_back_when_scheduling_fails(monkeypatch):
+    ready = trio.Event()
+    child_failed = trio.Event()
+
+    def fail_to_schedule(task):
+        raise RuntimeError("cannot schedule")
+
+    class ServiceTest(Service):
+        async def run(self):
+            await ready.wait()
+            # A task scheduled from within `run` is a child of the `run` task.
+            with pytest.raises(RuntimeError):
+                self.manager.run_task(trio.sleep_forever)
+            child_failed.set()
+            await self.manager.wait_finished()
+
+    # A task left behind in the task tree is never scheduled, so cancelling
+    # the service would wait on it forever.
+    with trio.fail_after(1):
+        async with background_trio_service(ServiceTest()) as manager:
+            monkeypatch.setattr(manager, "_schedule_task", fail_to_schedule)
+
+            # A task scheduled from outside the service is a root task.
+            with pytest.raises(RuntimeError):
+                manager.run_task(trio.sleep_forever)
+
+            ready.set()
+            await child_failed.wait()
+
+            assert manager.stats.tasks.total_count == 0
+            manager.cancel()
+
+    assert manager.is_finished
+    assert not manager.did_error
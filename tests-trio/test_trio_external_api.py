@@ -1,7 +1,9 @@
 import pytest
 import trio
+import trio.testing
 
-from async_service import LifecycleError, Service, background_trio_service
+from async_service import LifecycleError, ManagerAPI, Service, background_trio_service
+from async_service.stats import Stats, TaskStats
 from async_service.trio import external_api
 
 
@@ -97,3 +99,108 @@ async def test_trio_external_api_call_that_schedules_task():
         await service.do_scheduling()
         with trio.fail_after(1):
             await done.wait()
+
+
+@pytest.mark.trio
+async def test_trio_external_api_call_schedules_root_task():
+    class MyService(Service):
+        async def run(self):
+            await self.schedule_from_api()
+            await self.manager.wait_finished()
+
+        @external_api
+        async def schedule_from_api(self):
+            self.manager.run_task(trio.sleep_forever, name="spawned")
+
+    async with background_trio_service(MyService()) as manager:
+        await trio.testing.wait_all_tasks_blocked()
+        assert sorted(task.name for task in manager._root_tasks) == ["run", "spawned"]
+
+
+class EventManager(ManagerAPI):
+    """
+    A minimal :class:`async_service.abc.ManagerAPI` which is not a
+    :class:`async_service.trio.TrioManager`.  It only tracks the service
+    lifecycle and never runs the service itself.
+    """
+
+    def __init__(self, service):
+        service._manager = self
+        self._started = trio.Event()
+        self._cancelled = trio.Event()
+        self._finished = trio.Event()
+
+    @property
+    def is_started(self):
+        return self._started.is_set()
+
+    @property
+    def is_running(self):
+        return self.is_started and not self.is_finished
+
+    @property
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def is_finished(self):
+        return self._finished.is_set()
+
+    @property
+    def did_error(self):
+        return False
+
+    def cancel(self):
+        self._cancelled.set()
+
+    async def stop(self):
+        self.cancel()
+        await self.wait_finished()
+
+    async def wait_started(self):
+        await self._started.wait()
+
+    async def wait_finished(self):
+        await self._finished.wait()
+
+    @classmethod
+    async def run_service(cls, service):
+        await cls(service).run()
+
+    async def run(self):
+        self._started.set()
+        try:
+            await self._cancelled.wait()
+        finally:
+            self._finished.set()
+
+    @property
+    def stats(self):
+        return Stats(tasks=TaskStats(total_count=0, finished_count=0))
+
+
+@pytest.mark.trio
+async def test_trio_external_api_with_non_trio_manager():
+    service = ExternalAPIService()
+    manager = EventManager(service)
+
+    async with trio.open_nursery() as nursery:
+        nursery.start_soon(manager.run)
+        await manager.wait_started()
+
+        assert await service.get_7() == 7
+
+        with pytest.raises(LifecycleError):
+            async with trio.open_nursery() as api_nursery:
+                is_within_fn = trio.Event()
+                trigger_return = trio.Event()
+
+                api_nursery.start_soon(service.get_7, trigger_return, is_within_fn)
+                await is_within_fn.wait()
+
+                # the in-flight call is cancelled once the service finishes
+                await manager.stop()
+
+    # A direct call should also fail now that the service is finished.
+    with pytest.raises(LifecycleError):
+        await service.get_7()
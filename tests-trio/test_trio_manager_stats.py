@@ -81,3 +81,37 @@ async def test_trio_manager_stats_does_not_count_main_run_method():
     assert manager.stats.tasks.total_count == 1
     assert manager.stats.tasks.finished_count == 1
     assert manager.stats.tasks.pending_count == 0
+
+
+@pytest.mark.trio
+async def test_trio_manager_stats_external_root_task_after_run_returns():
+    release_run = trio.Event()
+
+    class StatsTest(Service):
+        async def run(self):
+            await release_run.wait()
+
+        def run_external_root(self):
+            self.manager.run_task(trio.sleep_forever)
+
+    service = StatsTest()
+    async with background_trio_service(service) as manager:
+        # The external root task keeps the service running once `Service.run`
+        # has returned.
+        service.run_external_root()
+        release_run.set()
+
+        # we need to yield to the event loop a few times to allow the various
+        # tasks to schedule themselves and get running.
+        for _ in range(10):
+            await trio.lowlevel.checkpoint()
+
+        assert manager.is_running
+        assert manager.stats.tasks.total_count == 1
+        assert manager.stats.tasks.finished_count == 0
+        assert manager.stats.tasks.pending_count == 1
+
+    # now check after exiting
+    assert manager.stats.tasks.total_count == 1
+    assert manager.stats.tasks.finished_count == 1
+    assert manager.stats.tasks.pending_count == 0
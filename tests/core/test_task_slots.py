@@ -0,0 +1,36 @@
+import pytest
+
+from async_service import Service
+from async_service.asyncio import (
+    ChildServiceTask as AsyncioChildServiceTask,
+    FunctionTask as AsyncioFunctionTask,
+)
+from async_service.trio import (
+    ChildServiceTask as TrioChildServiceTask,
+    FunctionTask as TrioFunctionTask,
+)
+
+
+async def async_fn_for_test():
+    pass
+
+
+class ServiceForTest(Service):
+    async def run(self):
+        pass
+
+
+@pytest.mark.parametrize(
+    "make_task",
+    (
+        lambda: TrioFunctionTask("fn", False, None, async_fn_for_test, ()),
+        lambda: AsyncioFunctionTask("fn", False, None, async_fn_for_test, ()),
+        lambda: TrioChildServiceTask("child", False, None, ServiceForTest()),
+        lambda: AsyncioChildServiceTask("child", False, None, ServiceForTest(), None),
+    ),
+)
+def test_tasks_use_slots(make_task):
+    task = make_task()
+    assert not hasattr(task, "__dict__")
+    # tasks still need to be usable in sets and as dict keys
+    assert task in {task}